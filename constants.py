@@ -1,6 +1,7 @@
 # Centralized constants for tuning
 GRID_SIZE = 10
 THE_MARKET = (5, 5)
+NUM_ACTIONS = 13
 
 MAX_STAT = 100.0
 MAX_HEALTH = 100.0
@@ -0,0 +1,57 @@
+# Per-agent decision and Q-update kernels. Compiled with numba when it is installed; otherwise the
+# equivalent NumPy implementations are used.
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+EXIT_ACTION = 12
+
+def _decide_actions_numpy(q, rows, x, y, s, r, survival, purpose, sample_actions, explore, random_actions):
+    qs = q[rows[:, None], x[:, None], y[:, None], s[:, None], r[:, None], sample_actions]
+    utility = qs + survival[:, None] + np.where(sample_actions == EXIT_ACTION, purpose[:, None], 0.0)
+    best = sample_actions[np.arange(len(rows)), np.argmax(utility, axis=1)]
+    return np.where(explore, random_actions, best)
+
+def _update_q_numpy(q, rows, x, y, s, r, actions, delta_U, alpha):
+    # rows are distinct, so the fancy-indexed read-modify-write never aliases
+    key = (rows, x, y, s, r, actions)
+    q[key] += alpha * (delta_U - q[key])
+
+if HAVE_NUMBA:
+    # Loop-based on purpose: numba generates tighter code for explicit loops than for array expressions.
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _decide_actions_jit(q, rows, x, y, s, r, survival, purpose, sample_actions, explore, random_actions):
+        n = rows.shape[0]
+        out = np.empty(n, dtype=np.int64)
+        for j in prange(n):
+            if explore[j]:
+                out[j] = random_actions[j]
+                continue
+            i = rows[j]
+            best = sample_actions[j, 0]
+            best_u = q[i, x[j], y[j], s[j], r[j], best] + survival[j] + (purpose[j] if best == EXIT_ACTION else 0.0)
+            for k in range(1, sample_actions.shape[1]):
+                act = sample_actions[j, k]
+                u = q[i, x[j], y[j], s[j], r[j], act] + survival[j] + (purpose[j] if act == EXIT_ACTION else 0.0)
+                if u > best_u:
+                    best_u = u
+                    best = act
+            out[j] = best
+        return out
+
+    # Each agent owns its own Q-table slice, so iterations never touch the same memory.
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _update_q_jit(q, rows, x, y, s, r, actions, delta_U, alpha):
+        for j in prange(rows.shape[0]):
+            cur = q[rows[j], x[j], y[j], s[j], r[j], actions[j]]
+            q[rows[j], x[j], y[j], s[j], r[j], actions[j]] = cur + alpha * (delta_U[j] - cur)
+
+    decide_actions = _decide_actions_jit
+    update_q = _update_q_jit
+else:
+    decide_actions = _decide_actions_numpy
+    update_q = _update_q_numpy
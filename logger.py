@@ -1,5 +1,7 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 
 LOG_FILE = Path("civilization_history.log")
@@ -16,15 +18,48 @@ def setup_logging(level=logging.INFO, max_bytes=5_000_000, backup_count=3):
     ch = logging.StreamHandler()
     ch.setLevel(level)
     ch.setFormatter(fmt)
-    logger.addHandler(ch)
 
     # Rotating file handler
-    fh = RotatingFileHandler(LOG_FILE, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    # delay: the file is only opened on the first record, so processes that redirect first never touch it
+    fh = RotatingFileHandler(LOG_FILE, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
     fh.setLevel(level)
     fh.setFormatter(fmt)
-    logger.addHandler(fh)
+
+    # The simulation thread only enqueues records; a background listener does the console/file I/O
+    q = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(q))
+    listener = QueueListener(q, ch, fh, respect_handler_level=True)
+    listener.start()
+    logger.queue_listener = listener
+    atexit.register(shutdown_logging)
 
     return logger
 
+def set_log_file(path, max_bytes=5_000_000, backup_count=3):
+    """
+    Point the rotating file handler at `path`. Each process should own its own file, since
+    RotatingFileHandler rotation is not safe across processes.
+    """
+    logger = setup_logging()
+    listener = logger.queue_listener
+    listener.stop()
+    old = next(h for h in listener.handlers if isinstance(h, RotatingFileHandler))
+    old.close()
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fh = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+    fh.setLevel(old.level)
+    fh.setFormatter(old.formatter)
+    listener.handlers = tuple(fh if h is old else h for h in listener.handlers)
+    listener.start()
+
+def shutdown_logging():
+    """Drain queued records and stop the background listener. Safe to call more than once."""
+    logger = logging.getLogger("project_genesis")
+    listener = getattr(logger, "queue_listener", None)
+    if listener is not None:
+        listener.stop()
+        logger.queue_listener = None
+
 def get_logger():
-    return setup_logging()
\ No newline at end of file
+    return setup_logging()
@@ -1,45 +1,62 @@
 import argparse
-import random
+import logging
 import csv
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Optional
+import numpy as np
 from .person import Person
-from .world import World, get_random_action, ACTIONS
-from .constants import CYCLES_PER_YEAR, CYCLES_PER_DEPENDENT_YEAR
-from .logger import get_logger
+from .population import (
+    PopulationArrays, STATUS_DEPENDENT, GOAL_DISCOVER_LIMITS,
+    bind_population, advance_dependents, apply_aging_and_decay, apply_grief, clip_stats, exploration_rate,
+)
+from . import kernels
+from .world import World, ACTIONS
+from .constants import NUM_ACTIONS, CYCLES_PER_YEAR
+from .logger import LOG_FILE, get_logger, set_log_file
 from pathlib import Path
-import matplotlib.pyplot as plt
 
 logger = get_logger()
 
-def _state_key(agent: Person, action_code: int):
-    return (agent.position, agent.sustenance > 50.0, agent.reputation > 50.0, action_code)
-
-def decide_action(agent: Person, population: List[Person]):
-    target = None
-    others = [a for a in population if a is not agent and a.relationship_status != "Dependent"]
-    if others:
-        target = random.choice(others)
-
-    if random.random() < agent.get_exploration_rate():
-        action = get_random_action()
-        agent.log(f"DECISION: exploring with {ACTIONS[action]}")
-        return action, target
-
-    sample_actions = random.sample(list(ACTIONS.keys()), k=min(len(ACTIONS), 5))
-    best = None
-    best_u = -float("inf")
-    for act in sample_actions:
-        key = _state_key(agent, act)
-        Q = agent.action_utility_tracker.get(key, 10.0)
-        survival_modifier = (100.0 - agent.sustenance) * agent.w_Sustenance
-        purpose = 0.0
-        if agent.personal_goal == "Discover the World's True Limits" and act == 12:
-            purpose = agent.w_Purpose_Goal * 100.0
-        utility = Q + survival_modifier + purpose
-        if utility > best_u:
-            best_u = utility
-            best = act
-    return best if best is not None else get_random_action(), target
+# Candidate actions scored per non-exploring decision
+ACTION_SAMPLE_SIZE = min(NUM_ACTIONS, 5)
+
+METRICS_DTYPE = np.dtype([
+    ("tick", "i4"),
+    ("population", "i4"),
+    ("exited", "i4"),
+    ("resource_level", "f4"),
+    ("avg_TiR", "f4"),
+])
+METRICS_FMT = ("%d", "%d", "%d", "%.3f", "%.3f")
+
+def _state_key(pop: PopulationArrays, rows: np.ndarray):
+    # Q-table state for each row: (x, y, sustenance > 50, reputation > 50)
+    return (
+        pop.position_x[rows],
+        pop.position_y[rows],
+        (pop.sustenance[rows] > 50.0).astype(np.int8),
+        (pop.reputation[rows] > 50.0).astype(np.int8),
+    )
+
+def choose_targets(candidates: np.ndarray, rows: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Pick a uniformly random other non-dependent agent for each row; -1 if there is none.
+    `candidates` is sorted and contains every row, so drawing from k-1 slots and stepping over
+    the caller's own slot never selects the caller.
+    """
+    if len(candidates) < 2:
+        return np.full(len(rows), -1, dtype=np.int64)
+    own_slot = np.searchsorted(candidates, rows)
+    slot = rng.integers(0, len(candidates) - 1, len(rows))
+    slot += slot >= own_slot
+    return candidates[slot]
+
+def decide_actions(pop: PopulationArrays, rows: np.ndarray, state, explore_mask: np.ndarray,
+                   random_actions: np.ndarray, sample_actions: np.ndarray) -> np.ndarray:
+    survival_modifier = (100.0 - pop.sustenance[rows]) * pop.w_Sustenance[rows]
+    purpose = np.where(pop.goal[rows] == GOAL_DISCOVER_LIMITS, pop.w_Purpose_Goal[rows] * 100.0, 0.0).astype(np.float32)
+    return kernels.decide_actions(pop.q, rows, *state, survival_modifier, purpose, sample_actions, explore_mask, random_actions)
 
 class Simulation:
     def __init__(self, turns: int = 10000, seed: Optional[int] = None, out_dir: str = "."):
@@ -48,10 +65,14 @@ class Simulation:
         self.out_dir = Path(out_dir)
         self.world = World()
         self.global_clock = 0
-        self.exit_log = []
         self.out_dir.mkdir(parents=True, exist_ok=True)
-        if seed is not None:
-            random.seed(seed)
+        # Exits are streamed to disk rather than kept, so exited agents can be freed immediately
+        # The file is opened lazily by run() or the first exit, and released by close()
+        self.exit_log_count = 0
+        self._exit_file = None
+        self._exit_writer = None
+        self._exit_log_started = False
+        self.rng = np.random.default_rng(seed)
 
         # initial population
         self.agents: List[Person] = [
@@ -59,118 +80,250 @@ class Simulation:
             Person("Clara", "Female", 22, (9, 9), personal_goal="Find Love and a Partner", TiR_score=60),
             Person("Elara", "Female", 30, (5, 5), personal_goal="Discover the World's True Limits", TiR_score=5),
         ]
+        self.pop: PopulationArrays = bind_population(self.agents)
+        # Sorted rows of every non-dependent agent; kept in step with maturation and removals
+        self.non_dependent_idx: np.ndarray = np.flatnonzero(self.pop.status != STATUS_DEPENDENT)
 
-        # metrics
-        self.metrics = []
+        # metrics: one preallocated row per tick; only the first n_metrics rows are filled
+        self.metrics = np.zeros(turns, dtype=METRICS_DTYPE)
+        self.n_metrics = 0
 
     def step(self):
         self.global_clock += 1
-        agents_to_remove = []
         new_children = []
+        pop = self.pop
 
-        for agent in list(self.agents):
-            if agent.relationship_status == "Dependent":
-                agent.turns_survived += 1
-                if agent.turns_survived >= CYCLES_PER_DEPENDENT_YEAR:
-                    agent.relationship_status = "Single"
-                    agent.age_years = 10
-                    agent.log(f"MILESTONE: {agent.name} matured")
-                continue
-
-            if agent.apply_aging_and_decay(self.global_clock):
-                agents_to_remove.append(agent)
-                continue
-
-            action, target = decide_action(agent, self.agents)
-            key = _state_key(agent, action)
-            env = self.world.get_env_data(agent, target)
-            is_exited, delta_U = self.world.process_action(agent, target, action, new_children)
-
-            # Q update
-            alpha = 0.5
-            cur_Q = agent.action_utility_tracker.get(key, 10.0)
-            new_Q = cur_Q + alpha * (delta_U - cur_Q)
-            agent.action_utility_tracker[key] = new_Q
-
-            if is_exited:
-                self.exit_log.append(agent)
-                agents_to_remove.append(agent)
-                for s in [a for a in self.agents if a is not agent]:
-                    if s.TiR_score < 50.0:
-                        s.self_confidence = 100.0
-                        s.TiR_score = max(0.0, s.TiR_score - 20.0)
-                        s.log(f"IDEOLOGY: {agent.name}'s exit changed TiR and confidence")
-
-            if action == 10 and target is not None:
-                child = agent.create_child(target)
-                new_children.append(child)
+        dependent = pop.status == STATUS_DEPENDENT
+        matured = advance_dependents(pop, dependent)
+        if matured.any():
+            self.non_dependent_idx = np.union1d(self.non_dependent_idx, np.flatnonzero(matured))
+        for i in np.flatnonzero(matured):
+            agent = self.agents[i]
+            agent._refresh_log_prefix()
+            agent.log("MILESTONE: %s matured", agent.name)
 
-        # grief + remove
-        for deceased in agents_to_remove:
-            for survivor in [a for a in self.agents if a is not deceased and a not in agents_to_remove]:
-                survivor.grieve_loss(deceased)
-            if deceased in self.agents:
-                self.agents.remove(deceased)
-                logger.info(f"COMMUNITY EVENT: {deceased.name} removed")
+        active = ~dependent
+        dead, aged = apply_aging_and_decay(pop, active)
+        for i in np.flatnonzero(dead):
+            agent = self.agents[i]
+            agent.log("MORTALITY: Died due to health (%.2f) or sustenance (%.2f)",
+                      max(0.0, agent.health), max(0.0, agent.sustenance))
+            agent.is_alive = False
+        for i in np.flatnonzero(aged):
+            agent = self.agents[i]
+            agent._refresh_log_prefix()
+            agent.log("AGE UP: Now %d years old.", agent.age_years)
+
+        # Draw every per-agent random number for this step up front
+        acting = np.flatnonzero(active & ~dead)
+        n_acting = len(acting)
+        explore_mask = self.rng.random(n_acting) < exploration_rate(pop.self_confidence[acting])
+        random_actions = self.rng.integers(0, NUM_ACTIONS, n_acting)
+        exit_roll = self.rng.random(n_acting)
+        # Sampled with replacement: a duplicate only narrows the argmax, and it avoids a per-row shuffle
+        sample_actions = self.rng.integers(0, NUM_ACTIONS, (n_acting, ACTION_SAMPLE_SIZE))
+        targets = choose_targets(self.non_dependent_idx, acting, self.rng)
+
+        state = _state_key(pop, acting)
+        actions = decide_actions(pop, acting, state, explore_mask, random_actions, sample_actions)
+        if logger.isEnabledFor(logging.INFO):
+            for j in np.flatnonzero(explore_mask):
+                self.agents[acting[j]].log("DECISION: exploring with %s", ACTIONS[actions[j]])
+        exited, delta_U = self.world.process_actions(pop, self.agents, acting, actions, targets, exit_roll)
 
-        self.agents.extend(new_children)
+        remove = dead.copy()
+        for j in np.flatnonzero(exited):
+            i = acting[j]
+            agent = self.agents[i]
+            if self._exit_writer is None:
+                self._open_exit_log()
+            self._exit_writer.writerow((self.global_clock, agent.name, f"{agent.TiR_score:.3f}"))
+            self.exit_log_count += 1
+            remove[i] = True
+            influenced = pop.TiR_score < 50.0
+            influenced[i] = False
+            pop.self_confidence[influenced] = 100.0
+            pop.TiR_score[influenced] = np.maximum(0.0, pop.TiR_score[influenced] - 20.0)
+            for k in np.flatnonzero(influenced):
+                self.agents[k].log("IDEOLOGY: %s's exit changed TiR and confidence", agent.name)
+
+        for j in np.flatnonzero((actions == 10) & (targets >= 0)):
+            child = self.agents[acting[j]].create_child(self.agents[targets[j]], rng=self.rng)
+            new_children.append(child)
+
+        # Q update, keyed on the state each agent decided in
+        kernels.update_q(pop.q, acting, *state, actions, delta_U, 0.5)
+
+        # grief + remove
+        if remove.any():
+            # Grief must subtract from bounded stats, or gains above the cap would absorb the trauma
+            clip_stats(pop)
+            partners = pop.partner_idx.copy()
+            for i in np.flatnonzero(apply_grief(pop, remove)):
+                survivor = self.agents[i]
+                survivor.partner_name = None
+                survivor.personal_goal = "Recovery and Solitude"
+                survivor.log("TRAUMA: Lost partner %s. Now grieving.", self.agents[partners[i]].name)
+            for i in np.flatnonzero(remove):
+                logger.info("COMMUNITY EVENT: %s removed", self.agents[i].name)
+            self._remove_agents(remove)
+        clip_stats(pop)
+        self._add_agents(new_children)
 
         # periodic outputs and metrics
         if self.global_clock % CYCLES_PER_YEAR == 0:
-            compliant = sum(1 for a in self.agents if a.TiR_score > 60.0)
-            rebel = sum(1 for a in self.agents if a.TiR_score < 40.0)
-            avg_age = sum(a.age_years for a in self.agents) / len(self.agents) if self.agents else 0.0
+            compliant = int(np.count_nonzero(pop.TiR_score > 60.0))
+            rebel = int(np.count_nonzero(pop.TiR_score < 40.0))
+            avg_age = float(pop.age_years.mean()) if self.agents else 0.0
             logger.info(f"YEAR {self.global_clock // CYCLES_PER_YEAR} | Pop {len(self.agents)} | AvgAge {avg_age:.1f} | C={compliant} R={rebel}")
 
         # flush metrics every step (lightweight)
-        self.metrics.append({
-            "tick": self.global_clock,
-            "population": len(self.agents),
-            "exited": len(self.exit_log),
-            "resource_level": self.world.resource_level,
-            "avg_TiR": (sum(a.TiR_score for a in self.agents) / len(self.agents)) if self.agents else 0.0
-        })
-
-    def run(self):
+        if self.n_metrics == len(self.metrics):
+            self.metrics = np.resize(self.metrics, max(1, 2 * len(self.metrics)))
+        self.metrics[self.n_metrics] = (
+            self.global_clock,
+            len(self.agents),
+            self.exit_log_count,
+            self.world.resource_level,
+            pop.TiR_score.mean() if self.agents else 0.0,
+        )
+        self.n_metrics += 1
+
+    def _remove_agents(self, remove: np.ndarray) -> None:
+        # Removed agents are not kept anywhere, so unbind them rather than copying their rows out
+        for i in np.flatnonzero(remove):
+            self.agents[i]._pop = None
+        remap = self.pop.remove(remove)
+        for i in np.flatnonzero((remap >= 0) & (remap != np.arange(len(remap)))):
+            agent = self.agents[i]
+            agent._idx = int(remap[i])
+            self.agents[agent._idx] = agent
+        del self.agents[len(self.pop):]
+        non_dependent = remap[self.non_dependent_idx]
+        self.non_dependent_idx = np.sort(non_dependent[non_dependent >= 0])
+
+    def _add_agents(self, people: List[Person]) -> None:
+        if not people:
+            return
+        bind_population(people, self.pop)
+        self.agents.extend(people)
+
+    def _open_exit_log(self) -> None:
+        # Truncate on the first open only; reopening after close() appends to this run's rows
+        mode = "a" if self._exit_log_started else "w"
+        self._exit_file = open(self.out_dir / "exits.csv", mode, newline="", encoding="utf-8")
+        self._exit_writer = csv.writer(self._exit_file)
+        if not self._exit_log_started:
+            self._exit_writer.writerow(("tick", "name", "TiR_score"))
+            self._exit_log_started = True
+
+    def close(self) -> None:
+        """Flush and close exits.csv. Needed when driving step() by hand; run() does it itself."""
+        if self._exit_file is not None:
+            self._exit_file.close()
+            self._exit_file = None
+            self._exit_writer = None
+
+    def __enter__(self) -> "Simulation":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def run(self, plot: bool = True):
         logger.info("Simulation start")
-        for _ in range(self.turns):
-            self.step()
+        if self._exit_file is None:
+            self._open_exit_log()
+        try:
+            for _ in range(self.turns):
+                self.step()
+        finally:
+            self.close()
 
         logger.info("Simulation finished")
         self._write_metrics()
-        self._plot_metrics()
+        if plot:
+            self._plot_metrics()
 
     def _write_metrics(self):
         out_csv = self.out_dir / "metrics.csv"
-        with open(out_csv, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=list(self.metrics[0].keys()))
-            writer.writeheader()
-            for row in self.metrics:
-                writer.writerow(row)
+        np.savetxt(out_csv, self.metrics[:self.n_metrics], fmt=METRICS_FMT, delimiter=",",
+                   header=",".join(METRICS_DTYPE.names), comments="", encoding="utf-8")
         logger.info(f"Wrote metrics to {out_csv}")
 
     def _plot_metrics(self):
-        ticks = [m["tick"] for m in self.metrics]
-        pop = [m["population"] for m in self.metrics]
-        tir = [m["avg_TiR"] for m in self.metrics]
-        res = [m["resource_level"] for m in self.metrics]
-
-        plt.figure(figsize=(10,6))
-        plt.plot(ticks, pop, label="Population")
-        plt.plot(ticks, tir, label="Avg TiR")
-        plt.plot(ticks, res, label="Resource Level")
-        plt.xlabel("Tick")
-        plt.legend()
-        out_png = self.out_dir / "metrics.png"
-        plt.savefig(out_png)
-        logger.info(f"Wrote plot to {out_png}")
+        plot_metrics(self.metrics[:self.n_metrics], self.out_dir / "metrics.png")
+
+def plot_metrics(m: np.ndarray, out_png: Path):
+    # Imported here so simulation runs and pool workers never pay for matplotlib; Agg needs no display
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    ticks, pop, tir, res = m["tick"], m["population"], m["avg_TiR"], m["resource_level"]
+
+    plt.figure(figsize=(10,6))
+    plt.plot(ticks, pop, label="Population")
+    plt.plot(ticks, tir, label="Avg TiR")
+    plt.plot(ticks, res, label="Resource Level")
+    plt.xlabel("Tick")
+    plt.legend()
+    plt.savefig(out_png)
+    plt.close()
+    logger.info(f"Wrote plot to {out_png}")
+
+def _init_worker(log_level: str):
+    logger.setLevel(log_level)
+    # Replicates are already the parallel axis; a full numba thread pool per worker would oversubscribe the cores
+    if kernels.HAVE_NUMBA:
+        import numba
+        numba.set_num_threads(1)
+
+def _run_one(turns: int, seed: Optional[int], out_dir: Path) -> np.ndarray:
+    # Each replicate logs into its own directory so no two processes rotate the same file
+    set_log_file(out_dir / LOG_FILE.name)
+    sim = Simulation(turns=turns, seed=seed, out_dir=out_dir)
+    # plotting is left to the parent process
+    sim.run(plot=False)
+    return sim.metrics[:sim.n_metrics]
+
+def run_replicates(turns: int, seed: Optional[int], out_dir: str, replicates: int, log_level: str = "INFO"):
+    """
+    Run independent simulations in parallel worker processes, replicate i seeded with seed + i and
+    writing metrics and its log to out_dir/rep{i}. The parent plots each replicate and stacks all metrics into one CSV.
+    """
+    out = Path(out_dir)
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(mp_context=ctx, initializer=_init_worker, initargs=(log_level,)) as ex:
+        futures = [
+            ex.submit(_run_one, turns, None if seed is None else seed + i, out / f"rep{i}")
+            for i in range(replicates)
+        ]
+        results = [f.result() for f in futures]
+
+    for i, m in enumerate(results):
+        plot_metrics(m, out / f"rep{i}" / "metrics.png")
+
+    out_csv = out / "replicates.csv"
+    with open(out_csv, "w", encoding="utf-8") as f:
+        f.write(",".join(("replicate",) + METRICS_DTYPE.names) + "\n")
+        for i, m in enumerate(results):
+            np.savetxt(f, m, fmt=f"{i}," + ",".join(METRICS_FMT))
+    logger.info(f"Wrote {replicates} replicates to {out_csv}")
 
 def main():
     parser = argparse.ArgumentParser(description="Run Project Genesis simulation")
     parser.add_argument("--turns", type=int, default=1000)
     parser.add_argument("--seed", type=int, default=None)
     parser.add_argument("--out", type=str, default="out")
+    parser.add_argument("--log-level", type=str, default="INFO", help="e.g. WARNING to skip per-agent logging on bulk runs")
+    parser.add_argument("--replicates", type=int, default=1, help="independent runs in parallel processes, seeded seed+i")
     args = parser.parse_args()
+    logger.setLevel(args.log_level.upper())
+
+    if args.replicates > 1:
+        run_replicates(args.turns, args.seed, args.out, args.replicates, args.log_level.upper())
+        return
 
     sim = Simulation(turns=args.turns, seed=args.seed, out_dir=args.out)
     sim.run()
@@ -1,7 +1,9 @@
-import random
-import uuid
-from typing import Tuple, Optional, Dict, Any
+import itertools
+import logging
+from typing import Tuple, Optional
+import numpy as np
 from .constants import MAX_HEALTH, MAX_STAT
+from .population import PopulationArrays, RELATIONSHIP_STATUSES, PERSONAL_GOALS, label_code
 from .logger import get_logger
 
 logger = get_logger()
@@ -9,7 +11,39 @@ logger = get_logger()
 def clamp(value: float, lo: float = 0.0, hi: float = MAX_STAT) -> float:
     return max(lo, min(hi, value))
 
+class _Column:
+    """Exposes this person's row of a PopulationArrays column as a plain scalar attribute."""
+    def __init__(self, cast):
+        self.cast = cast
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self.cast(getattr(obj._pop, self.name)[obj._idx])
+
+    def __set__(self, obj, value):
+        getattr(obj._pop, self.name)[obj._idx] = value
+
 class Person:
+    # Process-wide monotonic id source; cheaper than uuid4 and usable as an integer key
+    _next_id = itertools.count()
+
+    # Numeric state lives in a PopulationArrays row; a fresh Person owns a one-row table until
+    # the simulation binds it into the shared population.
+    health = _Column(float)
+    sustenance = _Column(float)
+    mood = _Column(float)
+    self_confidence = _Column(float)
+    reputation = _Column(float)
+    TiR_score = _Column(float)
+    age_years = _Column(int)
+    turns_survived = _Column(int)
+    w_Sustenance = _Column(float)
+    w_Purpose_Goal = _Column(float)
+
     def __init__(
         self,
         name: str,
@@ -19,10 +53,11 @@ class Person:
         relationship_status: str = "Single",
         personal_goal: str = "Acquire Wealth and Status",
         TiR_score: float = 50.0,
-        memory_cap: int = 500,
     ):
+        self._pop = PopulationArrays.allocate(1)
+        self._idx = 0
         self.name = name
-        self.id = uuid.uuid4()
+        self.id = next(Person._next_id)
         self.gender = gender
         self.age_years = age_years
         self.is_alive = True
@@ -45,10 +80,7 @@ class Person:
         # Position & memory
         self.position = start_pos
         self.last_action = "Initialize"
-        self.action_utility_tracker: Dict[Tuple[Any, ...], float] = {}
-
-        # Logging + memory cap
-        self.MEMORY_CAP = memory_cap
+        self._refresh_log_prefix()
 
         # Utility weights (tuneable)
         self.w_Sustenance = 1.0
@@ -56,63 +88,43 @@ class Person:
         self.w_Social_Bond = 0.5
         self.w_Purpose_Goal = 0.2
 
-    def log(self, message: str) -> None:
-        # Use shared logger; include id for clarity
-        logger.info(f"[{self.name}][age={self.age_years}][turns={self.turns_survived}] {message}")
-
-    def get_exploration_rate(self) -> float:
-        return clamp(1.0 - (self.self_confidence / MAX_STAT), 0.0, 1.0)
-
-    def get_health_decay_rate(self) -> float:
-        base_decay = 0.05
-        if self.age_years > 60:
-            return base_decay + ((self.age_years - 60) * 0.02)
-        return base_decay
-
-    def apply_aging_and_decay(self, current_cycle: int) -> bool:
-        # Apply per-turn decay
-        self.health = clamp(self.health - self.get_health_decay_rate(), 0.0, MAX_HEALTH)
-        self.sustenance = clamp(self.sustenance - 0.005, 0.0, MAX_STAT)
-
-        if self.health <= 0.0 or self.sustenance <= 0.0:
-            self.log(f"MORTALITY: Died due to health ({self.health:.2f}) or sustenance ({self.sustenance:.2f})")
-            self.is_alive = False
-            return True
-
-        self.turns_survived += 1
-        if self.turns_survived % 365 == 0:
-            self.age_years += 1
-            self.log(f"AGE UP: Now {self.age_years} years old.")
-            self._prune_memory()
-
-        # clamp mood/self_confidence/reputation defensively
-        self.mood = clamp(self.mood)
-        self.self_confidence = clamp(self.self_confidence)
-        self.reputation = clamp(self.reputation)
-        return False
-
-    def _prune_memory(self) -> None:
-        if len(self.action_utility_tracker) > self.MEMORY_CAP:
-            remove_count = len(self.action_utility_tracker) - self.MEMORY_CAP
-            keys = random.sample(list(self.action_utility_tracker.keys()), remove_count)
-            for k in keys:
-                del self.action_utility_tracker[k]
-            self.log(f"OPTIMIZATION: Pruned {remove_count} utility entries.")
-
-    def grieve_loss(self, deceased_agent: "Person") -> int:
-        trauma_penalty = 15
-        if deceased_agent.name == self.partner_name:
-            trauma_penalty = 40
-            self.relationship_status = "Grieving"
-            self.partner_name = None
-            self.personal_goal = "Recovery and Solitude"
-            self.log(f"TRAUMA: Lost partner {deceased_agent.name}. Now grieving.")
-        else:
-            self.log(f"COMMUNITY LOSS: Sad about {deceased_agent.name}'s passing.")
+    @property
+    def position(self) -> Tuple[int, int]:
+        return int(self._pop.position_x[self._idx]), int(self._pop.position_y[self._idx])
 
-        self.mood = clamp(self.mood - trauma_penalty)
-        self.health = clamp(self.health - (trauma_penalty / 2.0), 0.0, MAX_HEALTH)
-        return trauma_penalty
+    @position.setter
+    def position(self, pos: Tuple[int, int]) -> None:
+        self._pop.position_x[self._idx], self._pop.position_y[self._idx] = pos
+
+    @property
+    def relationship_status(self) -> str:
+        return RELATIONSHIP_STATUSES[self._pop.status[self._idx]]
+
+    @relationship_status.setter
+    def relationship_status(self, status: str) -> None:
+        self._pop.status[self._idx] = label_code(RELATIONSHIP_STATUSES, status)
+
+    @property
+    def personal_goal(self) -> str:
+        return PERSONAL_GOALS[self._pop.goal[self._idx]]
+
+    @personal_goal.setter
+    def personal_goal(self, goal: str) -> None:
+        self._pop.goal[self._idx] = label_code(PERSONAL_GOALS, goal)
+
+    @property
+    def Q(self) -> np.ndarray:
+        """Dense Q-table view, indexed [x, y, sustenance > 50, reputation > 50, action]."""
+        return self._pop.q[self._idx]
+
+    def _refresh_log_prefix(self) -> None:
+        # Cached "[name][age=N]" prefix; call again whenever age_years changes
+        self._log_prefix = f"[{self.name}][age={self.age_years}]"
+
+    def log(self, message: str, *args) -> None:
+        # `message` is a %-format string; nothing is formatted unless INFO records are enabled
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%s[turns=%d] " + message, self._log_prefix, self.turns_survived, *args)
 
     def share_belief(self, target_agent: "Person") -> float:
         belief_diff = self.TiR_score - target_agent.TiR_score
@@ -123,23 +135,29 @@ class Person:
 
         if abs(change_amount) > 2.0:
             direction = "Compliance" if change_amount > 0 else "Rebellion"
-            self.log(f"CULTURAL ACT: Persuaded {target_agent.name} towards {direction}. Δ={change_amount:.2f}")
+            self.log("CULTURAL ACT: Persuaded %s towards %s. Δ=%.2f", target_agent.name, direction, change_amount)
             return abs(change_amount) * 5.0
         else:
-            self.log(f"CULTURAL ACT: Shared beliefs; negligible effect.")
+            self.log("CULTURAL ACT: Shared beliefs; negligible effect.")
             return 0.0
 
-    def create_child(self, partner_agent: "Person", max_health_cap: float = MAX_HEALTH) -> "Person":
+    def create_child(
+        self,
+        partner_agent: "Person",
+        max_health_cap: float = MAX_HEALTH,
+        rng: Optional[np.random.Generator] = None,
+    ) -> "Person":
+        rng = rng if rng is not None else np.random.default_rng()
         names = ["Anya", "Kael", "Zora", "Elias", "Nomi"]
-        child_name = f"{random.choice(names)}_{random.randint(10,99)}"
-        child_gender = random.choice(["Male", "Female"])
+        child_name = f"{rng.choice(names)}_{rng.integers(10, 100)}"
+        child_gender = str(rng.choice(["Male", "Female"]))
 
         child_tir = (self.TiR_score + partner_agent.TiR_score) / 2.0
-        child_goal = random.choice([
+        child_goal = str(rng.choice([
             "Acquire Wealth and Status",
             "Find Love and a Partner",
             "Discover the World's True Limits",
-        ])
+        ]))
 
         initial_health = max(0.0, MAX_HEALTH + (self.reputation + partner_agent.reputation) / 5.0)
         initial_health = min(initial_health, max_health_cap)
@@ -152,11 +170,10 @@ class Person:
             relationship_status="Dependent",
             personal_goal=child_goal,
             TiR_score=child_tir,
-            memory_cap=self.MEMORY_CAP,
         )
         child.health = clamp(initial_health, 0.0, max_health_cap)
         child.sustenance = clamp(initial_health, 0.0, max_health_cap)
 
         self.progeny_count += 1
-        self.log(f"REPRODUCTION: Created {child.name} (health={child.health:.1f})")
+        self.log("REPRODUCTION: Created %s (health=%.1f)", child.name, child.health)
         return child
\ No newline at end of file
@@ -0,0 +1,212 @@
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+import numpy as np
+from .constants import GRID_SIZE, NUM_ACTIONS, MAX_HEALTH, MAX_STAT, CYCLES_PER_YEAR, CYCLES_PER_DEPENDENT_YEAR
+
+if TYPE_CHECKING:
+    from .person import Person
+
+# Relationship status and goal are stored as small integer codes; index into these lists for the label.
+# Labels outside the built-in set are appended on first use (see label_code), so the constants below stay fixed.
+RELATIONSHIP_STATUSES = ["Single", "Dependent", "Grieving"]
+STATUS_SINGLE = 0
+STATUS_DEPENDENT = 1
+STATUS_GRIEVING = 2
+
+PERSONAL_GOALS = [
+    "Acquire Wealth and Status",
+    "Find Love and a Partner",
+    "Discover the World's True Limits",
+    "Recovery and Solitude",
+]
+GOAL_DISCOVER_LIMITS = 2
+
+def label_code(labels: List[str], label: str) -> int:
+    """Code for `label` in `labels`, registering it if it is not known yet."""
+    try:
+        return labels.index(label)
+    except ValueError:
+        labels.append(label)
+        return len(labels) - 1
+
+# Core stats share one (n, 5) float32 matrix so a single np.clip bounds them all
+STAT_COLUMNS = ("health", "sustenance", "mood", "self_confidence", "reputation")
+STAT_MAX = np.array([MAX_HEALTH, MAX_STAT, MAX_STAT, MAX_STAT, MAX_STAT], dtype=np.float32)
+
+def _stat_column(col: int) -> property:
+    return property(lambda self: self.stats[:, col], doc=f"View of stats column {STAT_COLUMNS[col]!r}.")
+
+# Q-table layout per agent: [x, y, sustenance > 50, reputation > 50, action]
+Q_SHAPE = (GRID_SIZE, GRID_SIZE, 2, 2, NUM_ACTIONS)
+Q_INITIAL = 10.0
+
+@dataclass
+class PopulationArrays:
+    """
+    Struct-of-arrays storage for agent state. Row i of every column belongs to the same agent.
+    Each column is a view onto the first len(self) rows of a larger buffer, so appends fill spare
+    capacity and removals only move the rows that fill the holes.
+    """
+    stats: np.ndarray  # shape (n, len(STAT_COLUMNS))
+    TiR_score: np.ndarray
+    age_years: np.ndarray
+    turns_survived: np.ndarray
+    position_x: np.ndarray
+    position_y: np.ndarray
+    status: np.ndarray
+    goal: np.ndarray
+    w_Sustenance: np.ndarray
+    w_Purpose_Goal: np.ndarray
+    partner_idx: np.ndarray  # row of the partner in the same table, -1 if none
+    q: np.ndarray  # shape (n, *Q_SHAPE)
+
+    health = _stat_column(0)
+    sustenance = _stat_column(1)
+    mood = _stat_column(2)
+    self_confidence = _stat_column(3)
+    reputation = _stat_column(4)
+
+    def __post_init__(self):
+        self._buffers = {f.name: getattr(self, f.name) for f in fields(self)}
+        self._n = len(self.stats)
+
+    def _set_len(self, n: int) -> None:
+        self._n = n
+        for name, buf in self._buffers.items():
+            setattr(self, name, buf[:n])
+
+    @classmethod
+    def allocate(cls, n: int = 0) -> "PopulationArrays":
+        f32 = lambda: np.zeros(n, dtype=np.float32)
+        i32 = lambda: np.zeros(n, dtype=np.int32)
+        return cls(
+            stats=np.zeros((n, len(STAT_COLUMNS)), dtype=np.float32),
+            TiR_score=f32(),
+            age_years=i32(), turns_survived=i32(), position_x=i32(), position_y=i32(),
+            status=np.zeros(n, dtype=np.int8),
+            goal=np.zeros(n, dtype=np.int8),
+            w_Sustenance=f32(), w_Purpose_Goal=f32(),
+            partner_idx=np.full(n, -1, dtype=np.int32),
+            q=np.full((n, *Q_SHAPE), Q_INITIAL, dtype=np.float32),
+        )
+
+    @classmethod
+    def concat(cls, parts: Sequence["PopulationArrays"]) -> "PopulationArrays":
+        if not parts:
+            return cls.allocate(0)
+        return cls(**{f.name: np.concatenate([getattr(p, f.name) for p in parts]) for f in fields(cls)})
+
+    def __len__(self) -> int:
+        return self._n
+
+    def take(self, index) -> "PopulationArrays":
+        return PopulationArrays(**{f.name: getattr(self, f.name)[index] for f in fields(self)})
+
+    def extend(self, other: "PopulationArrays") -> None:
+        # Buffers grow geometrically and columns are re-pointed on this object, so bound Person views stay valid
+        n = self._n
+        needed = n + len(other)
+        capacity = len(self._buffers["stats"])
+        if needed > capacity:
+            capacity = max(needed, 2 * capacity)
+            for name, buf in self._buffers.items():
+                grown = np.empty((capacity, *buf.shape[1:]), dtype=buf.dtype)
+                grown[:n] = buf[:n]
+                self._buffers[name] = grown
+        for name, buf in self._buffers.items():
+            buf[n:needed] = getattr(other, name)
+        self._set_len(needed)
+
+    def remove(self, remove: np.ndarray) -> np.ndarray:
+        """
+        Swap-remove the masked rows: surviving rows past the new end move into the holes, so only
+        those rows (Q-tables included) are copied. Row order is not preserved. Returns the old-to-new
+        row map, -1 for removed rows.
+        """
+        n = self._n
+        removed = np.flatnonzero(remove)
+        new_n = n - len(removed)
+        holes = removed[removed < new_n]
+        movers = new_n + np.flatnonzero(~remove[new_n:])
+        for buf in self._buffers.values():
+            buf[holes] = buf[movers]
+
+        remap = np.arange(n)
+        remap[movers] = holes
+        remap[removed] = -1
+        self._set_len(new_n)
+
+        # Partner links are row numbers, so remap them to the new rows (or drop them)
+        linked = self.partner_idx >= 0
+        self.partner_idx[linked] = remap[self.partner_idx[linked]]
+        return remap
+
+def bind_population(people: List["Person"], pop: Optional[PopulationArrays] = None) -> PopulationArrays:
+    """
+    Gather each person's row into `pop` (or a new PopulationArrays) and rebind the people as views onto it.
+    """
+    rows = PopulationArrays.concat([p._pop.take([p._idx]) for p in people])
+    offset = 0
+    if pop is None:
+        pop = rows
+    else:
+        offset = len(pop)
+        pop.extend(rows)
+    for i, p in enumerate(people):
+        p._pop = pop
+        p._idx = offset + i
+    return pop
+
+def exploration_rate(self_confidence: np.ndarray) -> np.ndarray:
+    return np.clip(1.0 - (self_confidence / MAX_STAT), 0.0, 1.0)
+
+# Per-turn health decay indexed by age in years; ages past the end use the last entry
+_DECAY_LUT = np.array([0.05 if a <= 60 else 0.05 + (a - 60) * 0.02 for a in range(200)], dtype=np.float32)
+
+def health_decay_rate(age_years: np.ndarray) -> np.ndarray:
+    return _DECAY_LUT[np.minimum(age_years, len(_DECAY_LUT) - 1)]
+
+def advance_dependents(pop: PopulationArrays, dependent: np.ndarray) -> np.ndarray:
+    """Count a turn for every dependent and mature those who reached adulthood. Returns the matured mask."""
+    pop.turns_survived[dependent] += 1
+    matured = dependent & (pop.turns_survived >= CYCLES_PER_DEPENDENT_YEAR)
+    pop.status[matured] = STATUS_SINGLE
+    pop.age_years[matured] = 10
+    return matured
+
+def clip_stats(pop: PopulationArrays) -> None:
+    """Bound every core stat to [0, its max] in one pass over the stats matrix."""
+    np.clip(pop.stats, 0.0, STAT_MAX, out=pop.stats)
+
+def apply_aging_and_decay(pop: PopulationArrays, active: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply per-turn decay to the active agents. Returns (dead_mask, aged_mask). Stats are left
+    unclamped; the caller clips them once at the end of the step.
+    """
+    pop.health[active] -= health_decay_rate(pop.age_years[active])
+    pop.sustenance[active] -= 0.005
+
+    dead = active & ((pop.health <= 0.0) | (pop.sustenance <= 0.0))
+    alive = active & ~dead
+
+    pop.turns_survived[alive] += 1
+    aged = alive & (pop.turns_survived % CYCLES_PER_YEAR == 0)
+    pop.age_years[aged] += 1
+    return dead, aged
+
+def apply_grief(pop: PopulationArrays, removed: np.ndarray) -> np.ndarray:
+    """
+    Apply trauma from every removed agent to the survivors in one pass. Losing a partner costs 40
+    instead of 15. Returns the mask of survivors who lost their partner.
+    """
+    survivors = ~removed
+    dead_idx = np.flatnonzero(removed)
+    lost_partner = survivors & np.isin(pop.partner_idx, dead_idx)
+
+    trauma = np.where(lost_partner, 40.0 + 15.0 * (len(dead_idx) - 1), 15.0 * len(dead_idx)).astype(np.float32)
+    pop.mood[survivors] -= trauma[survivors]
+    pop.health[survivors] -= trauma[survivors] / 2.0
+
+    pop.status[lost_partner] = STATUS_GRIEVING
+    pop.partner_idx[lost_partner] = -1
+    return lost_partner
@@ -1,8 +1,9 @@
-import random
-import math
-from typing import Optional, Dict, Any, Tuple, List
-from .constants import GRID_SIZE, THE_MARKET, RESOURCE_MAX, MARKET_REGENERATION_RATE, MAX_HEALTH, MAX_STAT
-from .person import Person, clamp
+import logging
+from typing import Dict, Tuple, List
+import numpy as np
+from .constants import GRID_SIZE, THE_MARKET, NUM_ACTIONS, RESOURCE_MAX, MARKET_REGENERATION_RATE
+from .person import Person
+from .population import PopulationArrays
 from .logger import get_logger
 
 logger = get_logger()
@@ -23,8 +24,9 @@ ACTIONS = {
     12: "Attempt_Exit",
 }
 
-def get_random_action() -> int:
-    return random.choice(list(ACTIONS.keys()))
+# Grid step per action code; only the four Move_* actions are non-zero
+DIRS = np.zeros((NUM_ACTIONS, 2), dtype=np.int8)
+DIRS[:4] = [[0, 1], [0, -1], [1, 0], [-1, 0]]
 
 class World:
     def __init__(self, grid_size: int = GRID_SIZE, resource_level: float = RESOURCE_MAX, market_pos: Tuple[int, int] = THE_MARKET):
@@ -34,98 +36,118 @@ class World:
         self.resource_max = RESOURCE_MAX
         self.market_regen = MARKET_REGENERATION_RATE
 
-    def get_env_data(self, agent: Person, other_agent: Optional[Person]) -> Dict[str, Any]:
+    def get_env_data(self, pop: PopulationArrays, rows: np.ndarray, targets: np.ndarray) -> Dict[str, np.ndarray]:
+        """Per-row environment flags for `rows` and their `targets` (-1 for none), as boolean arrays."""
+        x = pop.position_x[rows]
+        y = pop.position_y[rows]
+        has_target = targets >= 0
+        t = np.where(has_target, targets, rows)
+        dx = pop.position_x[t] - x
+        dy = pop.position_y[t] - y
         return {
-            "resource_present": agent.position == self.market_pos,
-            "other_present": other_agent is not None and agent.position == other_agent.position,
-            "is_partner": other_agent is not None and other_agent.name == agent.partner_name,
-            "target_is_near": other_agent is not None and math.hypot(agent.position[0] - other_agent.position[0],
-                                                                      agent.position[1] - other_agent.position[1]) <= 1.0,
+            "resource_present": (x == self.market_pos[0]) & (y == self.market_pos[1]),
+            "other_present": has_target & (dx == 0) & (dy == 0),
+            "is_partner": has_target & (pop.partner_idx[rows] == targets),
+            # squared distance against the squared radius; no sqrt needed
+            "target_is_near": has_target & (dx * dx + dy * dy <= 1),
         }
 
-    def process_action(self, agent: Person, other_agent: Optional[Person], action_code: int, new_children: List[Person]) -> (bool, float):
+    def process_actions(self, pop: PopulationArrays, agents: List[Person], rows: np.ndarray, actions: np.ndarray,
+                        targets: np.ndarray, exit_roll: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Mutates agent (and possibly other_agent / world). Returns (is_exited, delta_U).
+        Apply one action per acting row to the population and world. `targets` holds each row's
+        other agent (-1 for none) and `exit_roll` its pre-drawn uniform sample for the exit attempt.
+        `agents` is only used for logging and belief sharing. Stats are left unclamped for the
+        end-of-step clip. Returns (exited_mask, delta_U).
         """
-        delta_U = 0.0
-        is_exited = False
+        n = len(rows)
+        delta_U = np.zeros(n, dtype=np.float32)
+        exited = np.zeros(n, dtype=bool)
+        verbose = logger.isEnabledFor(logging.INFO)
 
         # Base per-turn cost
-        agent.sustenance = clamp(agent.sustenance - 0.5)
-        agent.health = clamp(agent.health - 0.02, 0.0, MAX_HEALTH)
-
-        # Movement actions
-        if 0 <= action_code <= 3:
-            x, y = agent.position
-            if action_code == 0:
-                y += 1
-            elif action_code == 1:
-                y -= 1
-            elif action_code == 2:
-                x += 1
-            elif action_code == 3:
-                x -= 1
-
-            if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
-                agent.position = (x, y)
-                agent.log(f"MOVE: moved to {agent.position}")
-                delta_U = 1.0
-            else:
-                agent.log("MOVEMENT FAIL: boundary hit")
-                delta_U = -5.0
-
-        # Market
-        elif action_code == 4:
-            if agent.position == self.market_pos and self.resource_level >= 50.0:
-                self.resource_level -= 50.0
-                agent.sustenance = clamp(agent.sustenance + 65.0)
-                agent.health = clamp(agent.health + 8.0, 0.0, MAX_HEALTH)
-                agent.reputation = clamp(agent.reputation + 5.0)
-                delta_U = 70.0
-                agent.log(f"RESOURCE: {agent.name} used market (remaining: {self.resource_level:.0f})")
+        pop.sustenance[rows] -= 0.5
+        pop.health[rows] -= 0.02
+
+        # Movement actions: non-movement codes map to a zero step, so every row stays in bounds and in place
+        x = pop.position_x[rows]
+        y = pop.position_y[rows]
+        nx = x + DIRS[actions, 0]
+        ny = y + DIRS[actions, 1]
+        in_bounds = (nx >= 0) & (ny >= 0) & (nx < self.grid_size) & (ny < self.grid_size)
+        pop.position_x[rows] = np.where(in_bounds, nx, x)
+        pop.position_y[rows] = np.where(in_bounds, ny, y)
+        move = actions <= 3
+        delta_U[move] = np.where(in_bounds[move], 1.0, -5.0)
+        if verbose:
+            for j in np.flatnonzero(move):
+                agent = agents[rows[j]]
+                if in_bounds[j]:
+                    agent.log("MOVE: moved to %s", agent.position)
+                else:
+                    agent.log("MOVEMENT FAIL: boundary hit")
+
+        # Market: draws are served in row order against a resource that regenerates after every
+        # agent's turn, so walk only the market users and add the regeneration in between.
+        resource = self.resource_level
+        last = 0
+        market = np.flatnonzero(actions == 4)
+        at_market = (x[market] == self.market_pos[0]) & (y[market] == self.market_pos[1])
+        for j, present in zip(market, at_market):
+            i = rows[j]
+            resource = min(self.resource_max, resource + self.market_regen * (j - last))
+            last = j
+            if present and resource >= 50.0:
+                resource -= 50.0
+                pop.sustenance[i] += 65.0
+                pop.health[i] += 8.0
+                pop.reputation[i] += 5.0
+                delta_U[j] = 70.0
+                agents[i].log("RESOURCE: %s used market (remaining: %.0f)", agents[i].name, resource)
             else:
-                agent.sustenance = clamp(agent.sustenance - 10.0)
-                delta_U = -15.0
-                agent.log("RESOURCE FAIL: market not available")
-
-        elif action_code == 5:
-            agent.health = clamp(agent.health + 8.0, 0.0, MAX_HEALTH)
-            agent.sustenance = clamp(agent.sustenance + 15.0)
-            agent.mood = clamp(agent.mood + 5.0)
-            delta_U = 20.0
-            agent.log("MAINTENANCE: meditated and slept")
-
-        elif 6 <= action_code <= 10:
-            # placeholder: real implementations can be added / extended
-            delta_U = 10.0
-
-            # reproduction is handled in simulation by create_child
-            if action_code == 10 and other_agent is not None:
-                agent.log("REPRODUCTION: attempted")
-
-        elif action_code == 11 and other_agent is not None and agent.position == other_agent.position:
-            delta_U = agent.share_belief(other_agent)
-
-        elif action_code == 12:
-            agent.sustenance = clamp(agent.sustenance - 50.0)
-            agent.health = clamp(agent.health - 10.0, 0.0, MAX_HEALTH)
-            if agent.TiR_score < 10.0 and random.random() < 0.05:
-                agent.log(f"EXIT: {agent.name} has exited the grid")
-                is_exited = True
-                delta_U = 1000.0
-            else:
-                agent.mood = clamp(agent.mood - 25.0)
-                agent.log("EXISTENTIAL FAIL: exit attempt failed")
-                delta_U = -100.0
-
+                pop.sustenance[i] -= 10.0
+                delta_U[j] = -15.0
+                agents[i].log("RESOURCE FAIL: market not available")
         # End of turn: regenerate market resources
-        self.resource_level = clamp(self.resource_level + self.market_regen, 0.0, self.resource_max)
-
-        # Final clamping
-        agent.health = clamp(agent.health, 0.0, MAX_HEALTH)
-        agent.sustenance = clamp(agent.sustenance, 0.0, MAX_STAT)
-        agent.mood = clamp(agent.mood)
-        agent.reputation = clamp(agent.reputation)
-        agent.self_confidence = clamp(agent.self_confidence)
-
-        return is_exited, delta_U
\ No newline at end of file
+        self.resource_level = min(self.resource_max, resource + self.market_regen * (n - last))
+
+        rest = rows[actions == 5]
+        pop.health[rest] += 8.0
+        pop.sustenance[rest] += 15.0
+        pop.mood[rest] += 5.0
+        delta_U[actions == 5] = 20.0
+        if verbose:
+            for i in rest:
+                agents[i].log("MAINTENANCE: meditated and slept")
+
+        # placeholder: real implementations can be added / extended
+        # reproduction is handled in simulation by create_child
+        delta_U[(actions >= 6) & (actions <= 10)] = 10.0
+        if verbose:
+            for j in np.flatnonzero((actions == 10) & (targets >= 0)):
+                agents[rows[j]].log("REPRODUCTION: attempted")
+
+        # Sharing needs the target in the same cell; env flags are built only for the few sharers
+        share = np.flatnonzero((actions == 11) & (targets >= 0))
+        colocated = self.get_env_data(pop, rows[share], targets[share])["other_present"]
+        for j in share[colocated]:
+            delta_U[j] = agents[rows[j]].share_belief(agents[targets[j]])
+
+        exit_attempt = actions == 12
+        exit_rows = rows[exit_attempt]
+        pop.sustenance[exit_rows] -= 50.0
+        pop.health[exit_rows] -= 10.0
+        exited[exit_attempt] = (pop.TiR_score[exit_rows] < 10.0) & (exit_roll[exit_attempt] < 0.05)
+        failed = exit_attempt & ~exited
+        pop.mood[rows[failed]] -= 25.0
+        delta_U[exited] = 1000.0
+        delta_U[failed] = -100.0
+        if verbose:
+            for j in np.flatnonzero(exit_attempt):
+                agent = agents[rows[j]]
+                if exited[j]:
+                    agent.log("EXIT: %s has exited the grid", agent.name)
+                else:
+                    agent.log("EXISTENTIAL FAIL: exit attempt failed")
+
+        return exited, delta_U